@@ -9,7 +9,8 @@ echo ""
 
 # Check Python version
 PYTHON_VERSION=$(python3 --version 2>&1 | cut -d' ' -f2 | cut -d'.' -f1,2)
-REQUIRED_VERSION="3.9"
+# dataclass(slots=True) in src/config.py and src/weather.py needs 3.10+
+REQUIRED_VERSION="3.10"
 
 if [ "$(printf '%s\n' "$REQUIRED_VERSION" "$PYTHON_VERSION" | sort -V | head -n1)" != "$REQUIRED_VERSION" ]; then
     echo "❌ Python $REQUIRED_VERSION or higher is required (found: $PYTHON_VERSION)"
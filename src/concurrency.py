@@ -0,0 +1,21 @@
+"""Process-wide thread pool for blocking network calls.
+
+The platform posters and hosting uploads are all blocking (tweepy,
+requests); modules that want to overlap them share this single executor
+instead of spinning up a pool per call site.
+"""
+
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or lazily create the shared thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weatherman")
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
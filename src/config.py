@@ -1,27 +1,44 @@
 """Configuration loader for City Weather Poster."""
 
 import os
+import pickle
+import threading
 import yaml
 from pathlib import Path
+
+# Prefer the libyaml-backed loader when available (6-7x faster parse);
+# fall back to the pure-Python SafeLoader otherwise.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 from dataclasses import dataclass, field
 from typing import Optional
-import pytz
+from zoneinfo import ZoneInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class Coordinates:
     lat: float
     lon: float
 
 
-@dataclass
+@dataclass(slots=True)
 class PlatformConfig:
     twitter: bool = False
     instagram: bool = False
     tiktok: bool = False
+    # Names of the enabled platforms, precomputed so callers iterate this
+    # instead of getattr-probing each flag
+    enabled: tuple = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.enabled = tuple(
+            name for name in ("twitter", "instagram", "tiktok") if getattr(self, name)
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class CityConfig:
     """Configuration for a single city."""
     id: str
@@ -36,11 +53,22 @@ class CityConfig:
     name_local: Optional[str] = None
     posting_times: list = field(default_factory=lambda: ["08:00", "18:00"])
     hashtags: list = field(default_factory=list)
-    
+    # Lowercased, space-stripped forms used in hashtags; derived once here
+    # instead of replace+lower at every use site
+    slug: str = field(init=False, repr=False, compare=False)
+    country_slug: str = field(init=False, repr=False, compare=False)
+    _tz: Optional[object] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.slug = self.name.replace(" ", "").lower()
+        self.country_slug = self.country.replace(" ", "").lower()
+
     @property
     def tz(self):
-        """Get pytz timezone object."""
-        return pytz.timezone(self.timezone)
+        """Get ZoneInfo timezone object (memoized; tz lookups are not free)."""
+        if self._tz is None:
+            self._tz = ZoneInfo(self.timezone)
+        return self._tz
 
 
 @dataclass
@@ -56,17 +84,70 @@ class GlobalConfig:
 
 class Config:
     """Main configuration class."""
-    
+
+    # Environment variables snapshotted once at startup. Credentials don't
+    # change mid-process, so repeated os.getenv calls are wasted work.
+    ENV_KEYS = (
+        "GOOGLE_AI_API_KEY",
+        "OPENWEATHER_API_KEY",
+        "TWITTER_API_KEY",
+        "TWITTER_API_SECRET",
+        "TWITTER_ACCESS_TOKEN",
+        "TWITTER_ACCESS_TOKEN_SECRET",
+        "INSTAGRAM_ACCESS_TOKEN",
+        "INSTAGRAM_ACCOUNT_ID",
+        "TIKTOK_ACCESS_TOKEN",
+        "TIKTOK_OPEN_ID",
+    )
+
     def __init__(self, config_path: str = None):
         if config_path is None:
             config_path = Path(__file__).parent.parent / "config" / "cities.yaml"
 
-        with open(config_path, "r", encoding="utf-8") as f:
-            self._raw = yaml.safe_load(f)
-        
+        self._raw = self._load_raw(config_path)
+
+        # Snapshot credentials once (after load_dotenv has run in main).
+        # One environ copy instead of a getenv call per key.
+        env = os.environ.copy()
+        self._env = {key: env.get(key, "") for key in self.ENV_KEYS}
+        self._platform_credentials: dict[str, dict] = {}
+
         self._load_global()
         self._load_cities()
-    
+
+    @staticmethod
+    def _load_raw(config_path) -> dict:
+        """
+        Load and parse the YAML config, using a pickle sidecar cache.
+
+        Unpickling the parsed dict tree is roughly 10x faster than a YAML
+        parse, so we cache the result next to the YAML file keyed by its
+        (mtime, size) and reuse it while fresh. Cache failures fall back
+        to a normal parse; this is purely an optimization.
+        """
+        stat = os.stat(config_path)
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        cache_path = Path(str(config_path) + ".cache.pkl")
+
+        try:
+            with open(cache_path, "rb") as f:
+                key, raw = pickle.load(f)
+            if key == cache_key:
+                return raw
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+        with open(config_path, "r", encoding="utf-8") as f:
+            raw = yaml.load(f, Loader=_YamlLoader)
+
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump((cache_key, raw), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # Read-only filesystem etc. - cache is best-effort
+
+        return raw
+
     def _load_global(self):
         """Load global configuration."""
         g = self._raw.get("global", {})
@@ -82,11 +163,14 @@ class Config:
     def _load_cities(self):
         """Load all city configurations."""
         self.cities: dict[str, CityConfig] = {}
-        
+
+        # Hoist loop-invariant lookups out of the per-city construction
+        default_posting_times = self.global_config.default_posting_times
+
         for city_id, city_data in self._raw.get("cities", {}).items():
             coords = city_data.get("coordinates", {})
             platforms = city_data.get("platforms", {})
-            
+
             self.cities[city_id] = CityConfig(
                 id=city_id,
                 name=city_data.get("name", city_id.title()),
@@ -105,16 +189,16 @@ class Config:
                 enabled=city_data.get("enabled", True),
                 weight=city_data.get("weight", 1),
                 name_local=city_data.get("name_local"),
-                posting_times=city_data.get(
-                    "posting_times",
-                    self.global_config.default_posting_times
-                ),
+                posting_times=city_data.get("posting_times", default_posting_times),
                 hashtags=city_data.get("hashtags", []),
             )
-    
-    def get_enabled_cities(self) -> list[CityConfig]:
-        """Get all enabled cities."""
-        return [c for c in self.cities.values() if c.enabled]
+
+        # Enabled set never changes after load; compute the selection pool once
+        self._enabled_cities = tuple(c for c in self.cities.values() if c.enabled)
+
+    def get_enabled_cities(self) -> tuple[CityConfig, ...]:
+        """Get all enabled cities (cached at load time)."""
+        return self._enabled_cities
     
     def get_city(self, city_id: str) -> Optional[CityConfig]:
         """Get a specific city configuration."""
@@ -123,83 +207,98 @@ class Config:
     @property
     def google_ai_api_key(self) -> str:
         """Get Google AI API key from environment."""
-        return os.getenv("GOOGLE_AI_API_KEY", "")
-    
+        return self._env["GOOGLE_AI_API_KEY"]
+
     @property
     def openweather_api_key(self) -> str:
         """Get OpenWeatherMap API key from environment."""
-        return os.getenv("OPENWEATHER_API_KEY", "")
+        return self._env["OPENWEATHER_API_KEY"]
 
     # Platform credentials (global, shared across all cities)
     @property
     def twitter_api_key(self) -> str:
         """Get Twitter API key from environment."""
-        return os.getenv("TWITTER_API_KEY", "")
+        return self._env["TWITTER_API_KEY"]
 
     @property
     def twitter_api_secret(self) -> str:
         """Get Twitter API secret from environment."""
-        return os.getenv("TWITTER_API_SECRET", "")
+        return self._env["TWITTER_API_SECRET"]
 
     @property
     def twitter_access_token(self) -> str:
         """Get Twitter access token from environment."""
-        return os.getenv("TWITTER_ACCESS_TOKEN", "")
+        return self._env["TWITTER_ACCESS_TOKEN"]
 
     @property
     def twitter_access_token_secret(self) -> str:
         """Get Twitter access token secret from environment."""
-        return os.getenv("TWITTER_ACCESS_TOKEN_SECRET", "")
+        return self._env["TWITTER_ACCESS_TOKEN_SECRET"]
 
     @property
     def instagram_access_token(self) -> str:
         """Get Instagram access token from environment."""
-        return os.getenv("INSTAGRAM_ACCESS_TOKEN", "")
+        return self._env["INSTAGRAM_ACCESS_TOKEN"]
 
     @property
     def instagram_account_id(self) -> str:
         """Get Instagram account ID from environment."""
-        return os.getenv("INSTAGRAM_ACCOUNT_ID", "")
+        return self._env["INSTAGRAM_ACCOUNT_ID"]
 
     @property
     def tiktok_access_token(self) -> str:
         """Get TikTok access token from environment."""
-        return os.getenv("TIKTOK_ACCESS_TOKEN", "")
+        return self._env["TIKTOK_ACCESS_TOKEN"]
 
     @property
     def tiktok_open_id(self) -> str:
         """Get TikTok Open ID from environment."""
-        return os.getenv("TIKTOK_OPEN_ID", "")
+        return self._env["TIKTOK_OPEN_ID"]
+
+    # Maps platform name -> (credential key, env var) pairs; drives
+    # get_platform_credentials instead of an if/elif ladder per platform.
+    _PLATFORM_CRED_SPEC = {
+        "twitter": (
+            ("api_key", "TWITTER_API_KEY"),
+            ("api_secret", "TWITTER_API_SECRET"),
+            ("access_token", "TWITTER_ACCESS_TOKEN"),
+            ("access_token_secret", "TWITTER_ACCESS_TOKEN_SECRET"),
+        ),
+        "instagram": (
+            ("access_token", "INSTAGRAM_ACCESS_TOKEN"),
+            ("account_id", "INSTAGRAM_ACCOUNT_ID"),
+        ),
+        "tiktok": (
+            ("access_token", "TIKTOK_ACCESS_TOKEN"),
+            ("open_id", "TIKTOK_OPEN_ID"),
+        ),
+    }
 
     def get_platform_credentials(self, platform: str) -> dict:
-        """Get global credentials for a platform."""
-        if platform == "twitter":
-            return {
-                "api_key": self.twitter_api_key,
-                "api_secret": self.twitter_api_secret,
-                "access_token": self.twitter_access_token,
-                "access_token_secret": self.twitter_access_token_secret,
-            }
-        elif platform == "instagram":
-            return {
-                "access_token": self.instagram_access_token,
-                "account_id": self.instagram_account_id,
-            }
-        elif platform == "tiktok":
-            return {
-                "access_token": self.tiktok_access_token,
-                "open_id": self.tiktok_open_id,
-            }
-        return {}
+        """Get global credentials for a platform (cached per platform)."""
+        cached = self._platform_credentials.get(platform)
+        if cached is not None:
+            return cached
+
+        spec = self._PLATFORM_CRED_SPEC.get(platform, ())
+        creds = {key: self._env[env_key] for key, env_key in spec}
+
+        self._platform_credentials[platform] = creds
+        return creds
 
 
 # Singleton instance
 _config: Optional[Config] = None
+_config_lock = threading.Lock()
 
 
 def get_config(config_path: str = None) -> Config:
-    """Get or create config singleton."""
+    """Get or create config singleton (thread-safe)."""
     global _config
+    # Double-checked locking: the fast path stays lock-free once the
+    # singleton exists; the lock only guards first construction.
     if _config is None:
-        _config = Config(config_path)
+        with _config_lock:
+            if _config is None:
+                _config = Config(config_path)
     return _config
@@ -1,73 +1,62 @@
 """Image generation using Google's Nano Banana (Gemini 2.5 Flash Image)."""
 
+import logging
 import os
 import base64
+import io
 import random
+import time
+from string import Template
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
-
-from google import genai
-from google.genai import types
 
 from .config import CityConfig, get_config
 from .weather import WeatherData
 
-
-class ImageGenerator:
-    """Generate city weather images using Nano Banana (Gemini 2.5 Flash Image)."""
-    
-    # Model name for Nano Banana (stable GA version)
-    MODEL = "gemini-2.5-flash-image"
-    
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or get_config().google_ai_api_key
-        if not self.api_key:
-            raise ValueError("Google AI API key not configured")
-        
-        # Initialize the client
-        self.client = genai.Client(api_key=self.api_key)
-
-    def get_atmospheric_condition(self, weather: WeatherData) -> str:
-        """Map weather data to detailed atmospheric description."""
-        condition_lower = weather.main_condition.lower()
-        desc_lower = weather.description.lower()
-
-        if 'rain' in condition_lower or 'rain' in desc_lower or 'drizzle' in desc_lower:
-            return "Rainy atmosphere - wet surfaces with reflective sheen, puddles on streets and plazas, rain streaks visible in air, darker color saturation on buildings and surfaces, overcast lighting with soft diffused shadows, grey sky, moisture in the air"
-        elif 'clear' in condition_lower or ('clear' in desc_lower and 'sky' in desc_lower):
-            return "Sunny atmosphere - bright even lighting across entire scene, strong defined shadows cast by buildings and objects, vibrant saturated colors, clear blue sky element visible, warm temperature feel with golden tones, crisp air quality"
-        elif 'cloud' in condition_lower:
-            return "Cloudy atmosphere - soft diffused lighting throughout scene, muted pastel colors, grey atmospheric tone, no harsh shadows, overcast mood, gentle even illumination"
-        elif 'snow' in condition_lower or 'snow' in desc_lower:
-            return "Snowy atmosphere - white snow covering roofs and ground surfaces, icicles hanging from eaves, cold blue color tones throughout, winter atmosphere, soft white blanket over scene, crisp winter air feeling"
-        elif 'mist' in condition_lower or 'fog' in condition_lower or 'haze' in desc_lower or 'mist' in desc_lower:
-            return "Foggy atmosphere - misty haze around buildings, reduced visibility at scene edges, ethereal dreamy quality, soft diffused lighting through fog, mysterious mood"
-        else:
-            return "Pleasant clear weather - natural balanced lighting, gentle soft shadows, moderate color saturation, comfortable atmosphere"
-
-    def build_prompt(self, city: CityConfig, weather: WeatherData) -> str:
-        """Build the comprehensive image generation prompt."""
-
-        # Get weather-specific atmospheric condition
-        atmospheric_condition = self.get_atmospheric_condition(weather)
-
-        # Determine window lighting based on weather and time
-        is_dark = not weather.is_daytime or 'rain' in weather.description.lower() or 'cloud' in weather.main_condition.lower()
-        window_lights = "Interior building lights visible glowing warmly" if is_dark else "Windows reflective, interior lights off for bright day"
-
-        # Randomly select 5-8 landmarks for variety
-        num_landmarks = random.randint(5, min(8, len(city.landmarks)))
-        selected_landmarks = random.sample(city.landmarks, num_landmarks)
-        landmarks_text = "\n".join(f"- {landmark}" for landmark in selected_landmarks)
-
-        # Build the comprehensive prompt
-        prompt = f"""Generate a professional 3D isometric miniature diorama city model with weather overlay for {city.name}, {city.country}.
+logger = logging.getLogger(__name__)
+
+
+# Ordered (condition keywords, description keywords, atmosphere) entries;
+# first entry whose keywords match wins, mirroring the old if/elif order.
+_ATMOSPHERIC_CONDITIONS = (
+    (
+        ("rain",),
+        ("rain", "drizzle"),
+        "Rainy atmosphere - wet surfaces with reflective sheen, puddles on streets and plazas, rain streaks visible in air, darker color saturation on buildings and surfaces, overcast lighting with soft diffused shadows, grey sky, moisture in the air",
+    ),
+    (
+        ("clear",),
+        ("clear sky",),
+        "Sunny atmosphere - bright even lighting across entire scene, strong defined shadows cast by buildings and objects, vibrant saturated colors, clear blue sky element visible, warm temperature feel with golden tones, crisp air quality",
+    ),
+    (
+        ("cloud",),
+        (),
+        "Cloudy atmosphere - soft diffused lighting throughout scene, muted pastel colors, grey atmospheric tone, no harsh shadows, overcast mood, gentle even illumination",
+    ),
+    (
+        ("snow",),
+        ("snow",),
+        "Snowy atmosphere - white snow covering roofs and ground surfaces, icicles hanging from eaves, cold blue color tones throughout, winter atmosphere, soft white blanket over scene, crisp winter air feeling",
+    ),
+    (
+        ("mist", "fog"),
+        ("haze", "mist"),
+        "Foggy atmosphere - misty haze around buildings, reduced visibility at scene edges, ethereal dreamy quality, soft diffused lighting through fog, mysterious mood",
+    ),
+)
+
+_DEFAULT_ATMOSPHERE = "Pleasant clear weather - natural balanced lighting, gentle soft shadows, moderate color saturation, comfortable atmosphere"
+
+
+# Prompt scaffolding compiled once at import; build_prompt only fills in
+# the per-call city and weather values.
+_PROMPT_TEMPLATE = Template("""Generate a professional 3D isometric miniature diorama city model with weather overlay for ${city_name}, ${country}.
 
 CONCEPT:
 Create a charming architectural toy model aesthetic meeting functional weather visualization design. This is a square 1080x1080px social media graphic combining miniature city model craftsmanship with current weather information display.
 
-CITY DIORAMA CONSTRUCTION FOR {city.name}, {city.country}:
+CITY DIORAMA CONSTRUCTION FOR ${city_name}, ${country}:
 
 Base Structure:
 - Rounded rectangular miniature base with beveled wooden-textured edges (approximately 2cm thick appearance)
@@ -76,8 +65,8 @@ Base Structure:
 - Organic city planning with curved streets, river or waterway if geographically applicable, main landmarks prominently featured in composition
 
 Architectural Elements - Iconic Landmarks and Buildings:
-The scene must feature these specific landmarks and architectural elements of {city.name}:
-{landmarks_text}
+The scene must feature these specific landmarks and architectural elements of ${city_name}:
+${landmarks_text}
 
 Additional architectural requirements:
 - Render 2-4 most iconic structures as detailed miniatures with accurate proportions and recognizable signature features
@@ -85,7 +74,7 @@ Additional architectural requirements:
 - Roof details with appropriate materials: terracotta clay tiles, slate, copper patina, or region-appropriate roofing with realistic texture and color
 - Tiny individual windows with subtle reflections and interior lighting glow, properly scaled
 - Miniature street-level doors and entrances with architectural detail and character
-- Architectural style must be authentic to {city.name}'s historical period and cultural aesthetic
+- Architectural style must be authentic to ${city_name}'s historical period and cultural aesthetic
 
 Urban Infrastructure:
 - Streets with realistic texture (cobblestone, asphalt, or appropriate paving) with proper street grid or historically-accurate layout
@@ -102,20 +91,20 @@ Landscape Elements:
 
 Miniature People & Vehicles:
 - Tiny human figures at 2-3mm scale scattered naturally throughout streets and squares (approximately 20-30 people visible)
-- Miniature vehicles: cars, trams, buses appropriate to {city.name} - simplified forms but recognizable, proper colors (approximately 5-10 vehicles)
+- Miniature vehicles: cars, trams, buses appropriate to ${city_name} - simplified forms but recognizable, proper colors (approximately 5-10 vehicles)
 - If city has waterways: small boats, tourist vessels, gondolas, ferries at appropriate scale
 - Density: populated but not crowded, creating authentic lived-in feeling without clutter
 
 CURRENT WEATHER INTEGRATION:
-Weather condition: {weather.description}
-Temperature: {weather.format_temperature('C')}
+Weather condition: ${weather_description}
+Temperature: ${temperature}
 
 Atmospheric Condition to Apply:
-{atmospheric_condition}
+${atmospheric_condition}
 
 Lighting Adaptation:
-- Time of day atmosphere: {weather.time_of_day}
-- {window_lights}
+- Time of day atmosphere: ${time_of_day}
+- ${window_lights}
 - Overall scene brightness and color temperature adapting to weather mood and conditions
 - Shadow quality matching weather: soft for cloudy/rainy, defined for sunny, minimal for foggy
 
@@ -123,7 +112,7 @@ TEXT OVERLAY SYSTEM - CRITICAL TYPOGRAPHY REQUIREMENTS:
 All text elements must be clearly legible with high contrast against the background.
 
 1. CITY NAME (Primary Header):
-   Content: "{city.name}, {city.country}"
+   Content: "${city_name}, ${country}"
    Typography: BOLD SANS-SERIF font (Montserrat Bold style or similar), ALL CAPITALS
    Color: Dark gray #3D4A5C
    Size: Large 72-80pt equivalent
@@ -131,14 +120,14 @@ All text elements must be clearly legible with high contrast against the backgro
    Style: Generous letter-spacing for modern clean aesthetic
 
 2. WEATHER ICON (Visual Weather Indicator):
-   Content: Simple line-art weather icon representing: {weather.emoji}
+   Content: Simple line-art weather icon representing: ${weather_emoji}
    Style: Minimalist outlined icon design with 3-4px stroke weight
    Color: Dark gray #3D4A5C matching text
    Size: Approximately 120x120px
    Position: Directly below city name, horizontally centered, 20px gap from name
 
 3. DATE (Temporal Information):
-   Content: "{weather.format_date('%B %d, %Y')}"
+   Content: "${date}"
    Typography: Regular sans-serif font (Montserrat Regular style or similar), sentence case
    Color: Dark gray #3D4A5C
    Size: Small 28-32pt equivalent
@@ -146,7 +135,7 @@ All text elements must be clearly legible with high contrast against the backgro
    Alignment: Left-aligned starting 15px from icon's right edge
 
 4. TEMPERATURE (Weather Data):
-   Content: "{weather.format_temperature('C')}"
+   Content: "${temperature}"
    Typography: Regular sans-serif font (Montserrat Regular style or similar)
    Color: Dark gray #3D4A5C
    Size: Medium 48-52pt equivalent
@@ -165,24 +154,149 @@ OUTPUT SPECIFICATIONS:
 - High quality rendering with anti-aliasing and smooth textures
 - Professional finish suitable for social media posting on Instagram, Twitter, TikTok
 - Consistent lighting across entire scene matching weather conditions
-- Polished miniature model aesthetic with realistic PBR materials"""
+- Polished miniature model aesthetic with realistic PBR materials""")
+
+
+# City name/country never change between calls, so the scaffolding with
+# those fields filled in is cached per city; only weather values are
+# substituted per call.
+_city_prompt_cache: dict[str, Template] = {}
+
+# Output directories already created this process; lets generate_image
+# skip the mkdir syscall on every call after the first.
+_prepared_dirs: set[Path] = set()
+
+# Default output location resolved once at import
+_DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "output"
+
+
+def _get_city_template(city: CityConfig) -> Template:
+    template = _city_prompt_cache.get(city.id)
+    if template is None:
+        template = Template(
+            _PROMPT_TEMPLATE.safe_substitute(city_name=city.name, country=city.country)
+        )
+        _city_prompt_cache[city.id] = template
+    return template
+
+
+class ImageGenerator:
+    """Generate city weather images using Nano Banana (Gemini 2.5 Flash Image)."""
+    
+    # Model name for Nano Banana (stable GA version)
+    MODEL = "gemini-2.5-flash-image"
+    
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or get_config().google_ai_api_key
+        if not self.api_key:
+            raise ValueError("Google AI API key not configured")
+
+        # Import lazily: the genai SDK is heavyweight and only needed once
+        # a generator is actually constructed, not at module import time.
+        from google import genai
+
+        # Initialize the client
+        self.client = genai.Client(api_key=self.api_key)
+
+    def get_atmospheric_condition(self, weather: WeatherData) -> str:
+        """Map weather data to detailed atmospheric description."""
+        condition_lower = weather.main_condition_lower
+        desc_lower = weather.description_lower
+
+        for condition_keys, desc_keys, atmosphere in _ATMOSPHERIC_CONDITIONS:
+            if any(k in condition_lower for k in condition_keys) or any(
+                k in desc_lower for k in desc_keys
+            ):
+                return atmosphere
+        return _DEFAULT_ATMOSPHERE
+
+    def build_prompt(self, city: CityConfig, weather: WeatherData) -> str:
+        """Build the comprehensive image generation prompt."""
+
+        # Get weather-specific atmospheric condition
+        atmospheric_condition = self.get_atmospheric_condition(weather)
+
+        # Determine window lighting based on weather and time
+        is_dark = not weather.is_daytime or 'rain' in weather.description_lower or 'cloud' in weather.main_condition_lower
+        window_lights = "Interior building lights visible glowing warmly" if is_dark else "Windows reflective, interior lights off for bright day"
+
+        # Randomly select 5-8 landmarks for variety: one Fisher-Yates
+        # shuffle plus a slice instead of separate randint + sample draws
+        pool = list(city.landmarks)
+        random.shuffle(pool)
+        upper = min(8, len(pool))
+        num_landmarks = 5 + int(random.random() * (upper - 4)) if upper >= 5 else upper
+        landmarks_text = "\n".join(f"- {landmark}" for landmark in pool[:num_landmarks])
+
+        prompt = _get_city_template(city).substitute(
+            landmarks_text=landmarks_text,
+            atmospheric_condition=atmospheric_condition,
+            window_lights=window_lights,
+            weather_description=weather.description,
+            temperature=weather.format_temperature('C'),
+            time_of_day=weather.time_of_day,
+            weather_emoji=weather.emoji,
+            date=weather.format_date('%B %d, %Y'),
+        )
 
         return prompt
     
+    # Keep at most this many cached images around
+    CACHE_MAX_IMAGES = 64
+
+    @staticmethod
+    def _cache_filename(city: CityConfig, weather: WeatherData) -> str:
+        """
+        Deterministic filename keyed by (city, local date, weather bucket).
+
+        Re-runs the same day with essentially the same weather (e.g. a
+        retry after a platform failure) reuse the image instead of paying
+        for another generation. Temperature is bucketed to 3°C so minor
+        drift between runs still hits the cache.
+        """
+        date_str = weather.timestamp.strftime("%Y%m%d")
+        condition = weather.main_condition.lower()
+        temp_bucket = int(weather.temperature_c // 3)
+        return f"{city.id}_{date_str}_{condition}_{temp_bucket}.png"
+
+    @classmethod
+    def _prune_cache(cls, output_dir: Path) -> None:
+        """Evict oldest cached images beyond CACHE_MAX_IMAGES (LRU by mtime)."""
+        images = sorted(output_dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+        for stale in images[: max(0, len(images) - cls.CACHE_MAX_IMAGES)]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
     def generate_image(
-        self, 
-        city: CityConfig, 
+        self,
+        city: CityConfig,
         weather: WeatherData,
         output_dir: str = None,
     ) -> Optional[Path]:
         """Generate a weather image for the city."""
-        
+
+        # Determine output path up front so we can serve a cached image
+        output_dir = _DEFAULT_OUTPUT_DIR if output_dir is None else Path(output_dir)
+
+        if output_dir not in _prepared_dirs:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            _prepared_dirs.add(output_dir)
+        output_path = output_dir / self._cache_filename(city, weather)
+
+        if output_path.exists():
+            logger.info(f"Using cached image for {city.name}: {output_path}")
+            return output_path
+
         # Build the prompt
         prompt = self.build_prompt(city, weather)
         
-        print(f"Generating image for {city.name}...")
-        print(f"Weather: {weather.description}, {weather.temperature_c:.1f}°C")
+        logger.info(f"Generating image for {city.name}...")
+        logger.info(f"Weather: {weather.description}, {weather.temperature_c:.1f}°C")
         
+        from google.genai import types
+
         try:
             # Generate the image using Nano Banana
             response = self.client.models.generate_content(
@@ -193,48 +307,47 @@ OUTPUT SPECIFICATIONS:
                 )
             )
             
-            # Extract the image from the response
+            # Extract the first inline image from the response
             image_data = None
-
-            # Debug: Check what we got back
-            print(f"Response candidates: {len(response.candidates)}")
             if response.candidates:
-                print(f"Parts in response: {len(response.candidates[0].content.parts)}")
-                for i, part in enumerate(response.candidates[0].content.parts):
-                    print(f"Part {i}: has inline_data={part.inline_data is not None}, text={part.text is not None if hasattr(part, 'text') else 'N/A'}")
-                    if part.inline_data is not None:
-                        image_data = part.inline_data.data
-                        print(f"Found image data in part {i}")
-                        break
+                image_data = next(
+                    (
+                        part.inline_data.data
+                        for part in response.candidates[0].content.parts
+                        if part.inline_data is not None
+                    ),
+                    None,
+                )
 
             if image_data is None:
-                print(f"No image generated for {city.name}")
-                print(f"Full response: {response}")
+                logger.error(f"No image generated for {city.name}")
                 return None
-            
-            # Determine output path
-            if output_dir is None:
-                output_dir = Path(__file__).parent.parent / "output"
-            else:
-                output_dir = Path(output_dir)
-            
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{city.id}_{timestamp}.png"
-            output_path = output_dir / filename
-            
-            # Save the image
-            image_bytes = base64.b64decode(image_data) if isinstance(image_data, str) else image_data
-            with open(output_path, "wb") as f:
-                f.write(image_bytes)
-            
-            print(f"Image saved: {output_path}")
+
+            # Save the image. SDK normally hands us raw bytes; if we got a
+            # base64 string instead, decode it straight into the file
+            # rather than materializing a second full-size buffer.
+            # Write to a temp file and rename onto the cache path: the
+            # deterministic filename doubles as a cache key, so a
+            # partial write must never become a servable cache hit.
+            tmp_path = output_path.with_suffix(".tmp")
+            try:
+                if isinstance(image_data, str):
+                    with open(tmp_path, "wb") as f:
+                        base64.decode(io.BytesIO(image_data.encode("ascii")), f)
+                else:
+                    tmp_path.write_bytes(image_data)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+            self._prune_cache(output_dir)
+
+            logger.info(f"Image saved: {output_path}")
             return output_path
             
         except Exception as e:
-            print(f"Error generating image for {city.name}: {e}")
+            logger.error(f"Error generating image for {city.name}: {e}")
             return None
     
     def generate_with_retry(
@@ -250,27 +363,37 @@ OUTPUT SPECIFICATIONS:
         max_attempts = max_attempts or config.global_config.retry_max_attempts
         
         for attempt in range(1, max_attempts + 1):
-            print(f"Attempt {attempt}/{max_attempts} for {city.name}")
+            logger.info(f"Attempt {attempt}/{max_attempts} for {city.name}")
             
             result = self.generate_image(city, weather, output_dir)
             if result is not None:
                 return result
             
             if attempt < max_attempts:
-                import time
-                delay = config.global_config.retry_delay_seconds
-                print(f"Retrying in {delay} seconds...")
+                # Exponential backoff with full jitter: doubling per failed
+                # attempt, randomized so parallel workflows don't retry in
+                # lockstep against the same rate limit.
+                cap = config.global_config.retry_delay_seconds * (2 ** (attempt - 1))
+                delay = random.uniform(cap / 2, cap)
+                logger.info(f"Retrying in {delay:.0f} seconds...")
                 time.sleep(delay)
         
-        print(f"Failed to generate image for {city.name} after {max_attempts} attempts")
+        logger.error(f"Failed to generate image for {city.name} after {max_attempts} attempts")
         return None
 
 
+# Generator singleton: keeps one genai client (and its HTTP connections)
+# alive across calls instead of re-reading the key and reconnecting.
+_generator: Optional[ImageGenerator] = None
+
+
 def generate_city_image(
-    city: CityConfig, 
+    city: CityConfig,
     weather: WeatherData,
     output_dir: str = None,
 ) -> Optional[Path]:
     """Convenience function to generate an image for a city."""
-    generator = ImageGenerator()
-    return generator.generate_with_retry(city, weather, output_dir=output_dir)
+    global _generator
+    if _generator is None:
+        _generator = ImageGenerator()
+    return _generator.generate_with_retry(city, weather, output_dir=output_dir)
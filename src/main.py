@@ -11,6 +11,8 @@ This script handles the full workflow:
 """
 
 import argparse
+import json
+import logging
 import sys
 import os
 from datetime import datetime, timezone
@@ -33,6 +35,22 @@ from .platforms.instagram import post_to_instagram
 from .platforms.tiktok import post_to_tiktok
 from .state_manager import StateManager, RecentlyPosted
 from .scheduler import select_random_city
+from .concurrency import get_executor
+
+
+# Platform name -> poster function, used by process_city's fan-out
+PLATFORM_POSTERS = {
+    "twitter": post_to_twitter,
+    "instagram": post_to_instagram,
+    "tiktok": post_to_tiktok,
+}
+
+# Credential keys each platform must have before we attempt to post
+CREDENTIAL_REQUIREMENTS = {
+    "twitter": frozenset({"api_key", "api_secret", "access_token", "access_token_secret"}),
+    "instagram": frozenset({"access_token", "account_id"}),
+    "tiktok": frozenset({"access_token"}),
+}
 
 
 def process_city(
@@ -40,6 +58,7 @@ def process_city(
     config: Config,
     dry_run: bool = False,
     output_dir: str = None,
+    skip_generation: bool = False,
 ) -> dict:
     """
     Process a single city: fetch weather, generate image, post to platforms.
@@ -49,6 +68,8 @@ def process_city(
         config: Global configuration object
         dry_run: If True, simulate without actually posting
         output_dir: Directory for generated images
+        skip_generation: With dry_run, skip the weather fetch and image
+            generation entirely (validates selection/platform wiring only)
 
     Returns:
         Dict with results for each platform
@@ -70,6 +91,13 @@ def process_city(
     print(f"Timezone: {city.timezone}")
     print(f"{'='*50}")
 
+    # Fast dry run: stop before spending API calls on weather or images
+    if dry_run and skip_generation:
+        print(f"\n🔸 Dry run: would post {city.name} to "
+              f"{', '.join(city.platforms.enabled) or 'no platforms'}")
+        results["success"] = True
+        return results
+
     # Step 1: Fetch weather
     print("\n📡 Fetching weather data...")
     weather = get_weather_for_city(city)
@@ -99,36 +127,30 @@ def process_city(
     results["image_path"] = str(image_path)
     print(f"✅ Image generated: {image_path}")
 
-    # Step 3: Post to platforms
+    # Step 3: Post to all enabled platforms concurrently. Each platform's
+    # flow is dominated by network waits (uploads, CDN propagation,
+    # container processing), so the blocking posters run in threads.
     print("\n📱 Posting to social media...")
 
-    # Twitter/X
-    if city.platforms.twitter:
-        print("\n🐦 Posting to Twitter/X...")
-        twitter_creds = config.get_platform_credentials("twitter")
-        results["twitter"] = post_to_twitter(city, image_path, weather, twitter_creds, dry_run)
-
-    # Instagram
-    if city.platforms.instagram:
-        print("\n📸 Posting to Instagram...")
-        instagram_creds = config.get_platform_credentials("instagram")
-        results["instagram"] = post_to_instagram(city, image_path, weather, instagram_creds, dry_run)
+    executor = get_executor()
+    futures = {}
+    for platform in city.platforms.enabled:
+        print(f"📤 Posting to {platform}...")
+        creds = config.get_platform_credentials(platform)
+        futures[platform] = executor.submit(
+            PLATFORM_POSTERS[platform], city, image_path, weather, creds, dry_run
+        )
 
-    # TikTok
-    if city.platforms.tiktok:
-        print("\n🎵 Posting to TikTok...")
-        tiktok_creds = config.get_platform_credentials("tiktok")
-        results["tiktok"] = post_to_tiktok(city, image_path, weather, tiktok_creds, dry_run)
+    for platform, future in futures.items():
+        try:
+            results[platform] = future.result()
+        except Exception as e:
+            print(f"❌ {platform} post failed: {e}")
+            results[platform] = None
 
     # Check if any platform succeeded
-    platforms_attempted = []
-    platforms_succeeded = []
-
-    for platform in ["twitter", "instagram", "tiktok"]:
-        if getattr(city.platforms, platform):
-            platforms_attempted.append(platform)
-            if results[platform]:
-                platforms_succeeded.append(platform)
+    platforms_attempted = list(city.platforms.enabled)
+    platforms_succeeded = [p for p in platforms_attempted if results[p]]
 
     results["success"] = len(platforms_succeeded) > 0
 
@@ -142,6 +164,10 @@ def process_city(
 def main():
     """Main entry point."""
 
+    # Library modules log through logging; plain message format keeps the
+    # Actions log output identical to the old prints
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     # Load environment variables from .env file if present
     load_dotenv()
 
@@ -160,6 +186,11 @@ def main():
         action="store_true",
         help="Simulate without actually posting",
     )
+    parser.add_argument(
+        "--skip-generation",
+        action="store_true",
+        help="With --dry-run: also skip weather fetch and image generation",
+    )
     parser.add_argument(
         "--output-dir",
         "-o",
@@ -225,10 +256,10 @@ def main():
     recent = state_manager.load_recent()
 
     # Get excluded city IDs (unless --force is used)
-    excluded_ids = [] if args.force else recent.get_excluded_ids()
+    excluded_ids = set() if args.force else recent.get_excluded_ids()
 
     if excluded_ids:
-        print(f"📋 Recently posted ({len(excluded_ids)} cities): {', '.join(excluded_ids[:5])}{'...' if len(excluded_ids) > 5 else ''}")
+        print(f"📋 Recently posted ({len(excluded_ids)} cities): {', '.join(sorted(excluded_ids)[:5])}{'...' if len(excluded_ids) > 5 else ''}")
 
     # Determine which city to process
     if args.city:
@@ -247,24 +278,16 @@ def main():
             return 1
         print(f"\n🎲 Random selection: {city.name}")
 
-    # Validate platform credentials for selected city
-    if city.platforms.twitter:
-        twitter_creds = config.get_platform_credentials("twitter")
-        if not all([twitter_creds.get("api_key"), twitter_creds.get("api_secret"),
-                    twitter_creds.get("access_token"), twitter_creds.get("access_token_secret")]):
-            print("❌ Error: Twitter credentials incomplete")
-            return 1
-
-    if city.platforms.instagram:
-        instagram_creds = config.get_platform_credentials("instagram")
-        if not all([instagram_creds.get("access_token"), instagram_creds.get("account_id")]):
-            print("❌ Error: Instagram credentials incomplete")
-            return 1
-
-    if city.platforms.tiktok:
-        tiktok_creds = config.get_platform_credentials("tiktok")
-        if not tiktok_creds.get("access_token"):
-            print("❌ Error: TikTok credentials incomplete")
+    # Validate platform credentials for selected city: compare the set of
+    # non-empty credential keys against each platform's requirements
+    for platform in city.platforms.enabled:
+        creds = config.get_platform_credentials(platform)
+        missing = CREDENTIAL_REQUIREMENTS[platform] - {
+            key for key, value in creds.items() if value
+        }
+        if missing:
+            print(f"❌ Error: {platform.capitalize()} credentials incomplete "
+                  f"(missing: {', '.join(sorted(missing))})")
             return 1
 
     print(f"\n🌍 City Weather Poster")
@@ -280,6 +303,7 @@ def main():
             config,
             dry_run=args.dry_run,
             output_dir=args.output_dir,
+            skip_generation=args.skip_generation,
         )
 
         # Track successful post (unless dry run)
@@ -305,6 +329,10 @@ def main():
     if result.get("error"):
         print(f"Error: {result['error']}")
 
+    # One machine-readable line with the full results dict, serialized in
+    # a single json.dumps call - easy to grep out of the Actions log
+    print("RESULT " + json.dumps(result, ensure_ascii=False, default=str))
+
     return 0 if result.get("success") else 1
 
 
@@ -0,0 +1,146 @@
+"""Shared public-image-hosting uploads.
+
+Instagram and TikTok both require the image at a public URL before
+posting. This module owns the upload flow for both: a custom hosting
+endpoint (IMAGE_HOSTING_ENDPOINT) or imgbb (IMGBB_API_KEY), with
+chunked base64 encoding and a content-hash URL cache so identical
+images are only uploaded once while their hosted URL is still live.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+import requests
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Shared session keeps pooled keep-alive connections to the hosting service
+_session = requests.Session()
+
+# Hosted-URL cache keyed by image content hash. TTL sits just under the
+# 24h imgbb expiration we request.
+_URL_CACHE_FILE = Path("state/image_url_cache.json")
+_URL_CACHE_TTL = 23 * 3600
+_url_cache: Optional[dict] = None
+
+
+def _file_digest(image_path: Path) -> str:
+    h = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _get_cached_url(digest: str) -> Optional[str]:
+    global _url_cache
+    if _url_cache is None:
+        try:
+            _url_cache = json.loads(_URL_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _url_cache = {}
+    entry = _url_cache.get(digest)
+    if entry and time.time() - entry["uploaded_at"] < _URL_CACHE_TTL:
+        return entry["url"]
+    return None
+
+
+def _store_cached_url(digest: str, url: str) -> None:
+    now = time.time()
+    # Drop expired entries while we're here
+    _url_cache.update({digest: {"url": url, "uploaded_at": now}})
+    for key in [k for k, v in _url_cache.items() if now - v["uploaded_at"] >= _URL_CACHE_TTL]:
+        del _url_cache[key]
+    try:
+        _URL_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _URL_CACHE_FILE.write_text(json.dumps(_url_cache), encoding="utf-8")
+    except OSError:
+        pass  # Cache persistence is best-effort
+
+
+def _encode_file_b64(image_path: Path) -> str:
+    """
+    Base64-encode a file in chunks.
+
+    Chunk size is a multiple of 3 bytes so each chunk encodes without
+    padding and the pieces concatenate cleanly; avoids holding the raw
+    file and its full encoding in memory at the same time.
+    """
+    chunks = []
+    with open(image_path, "rb") as f:
+        while chunk := f.read(3 * 64 * 1024):
+            chunks.append(base64.b64encode(chunk))
+    return b"".join(chunks).decode("ascii")
+
+
+def upload_image(image_path: Path) -> Optional[str]:
+    """
+    Upload an image to public hosting and return its URL.
+
+    Tries the custom IMAGE_HOSTING_ENDPOINT first, then imgbb via
+    IMGBB_API_KEY. Returns None if no hosting is configured or the
+    upload fails.
+    """
+    image_path = Path(image_path)
+    digest = _file_digest(image_path)
+    cached_url = _get_cached_url(digest)
+    if cached_url:
+        logger.info(f"Reusing hosted URL for {image_path.name}")
+        return cached_url
+
+    # Option 1: Use environment variable for your own hosting endpoint
+    hosting_endpoint = os.getenv("IMAGE_HOSTING_ENDPOINT")
+
+    if hosting_endpoint:
+        try:
+            with open(image_path, "rb") as f:
+                response = _session.post(
+                    hosting_endpoint,
+                    files={"image": f},
+                    timeout=60,
+                )
+                response.raise_for_status()
+                url = response.json().get("url")
+                if url:
+                    _store_cached_url(digest, url)
+                return url
+        except Exception as e:
+            logger.error(f"Error uploading to custom hosting: {e}")
+            return None
+
+    # Option 2: Use imgbb (free tier available)
+    imgbb_api_key = os.getenv("IMGBB_API_KEY")
+    if imgbb_api_key:
+        try:
+            image_data = _encode_file_b64(image_path)
+
+            response = _session.post(
+                "https://api.imgbb.com/1/upload",
+                data={
+                    "key": imgbb_api_key,
+                    "image": image_data,
+                    "expiration": 86400,  # 24 hours
+                },
+                timeout=60,
+            )
+            response.raise_for_status()
+            data = response.json()["data"]
+            # Use full quality URL (image.url or url) - NOT display_url which is compressed
+            # display_url = medium quality, url/image.url = full quality
+            full_quality_url = data.get("image", {}).get("url") or data.get("url")
+            logger.info(f"ImgBB full quality URL: {full_quality_url}")
+            if full_quality_url:
+                _store_cached_url(digest, full_quality_url)
+            return full_quality_url
+        except Exception as e:
+            logger.error(f"Error uploading to imgbb: {e}")
+            return None
+
+    logger.error("No image hosting configured. Set IMAGE_HOSTING_ENDPOINT or IMGBB_API_KEY")
+    return None
@@ -1,5 +1,6 @@
 """Instagram Graph API integration for posting weather images."""
 
+import logging
 import os
 import time
 import requests
@@ -10,7 +11,16 @@ from typing import Optional
 from PIL import Image, ImageFilter
 
 from ..config import CityConfig
+from ..concurrency import get_executor
 from ..weather import WeatherData
+from . import hosting
+
+logger = logging.getLogger(__name__)
+
+
+# Shared session for Graph API calls: keep-alive avoids a TLS handshake
+# per call in the multi-step container/publish flow.
+_session = requests.Session()
 
 
 class InstagramPoster:
@@ -22,6 +32,11 @@ class InstagramPoster:
         self.city = city
         self.credentials = credentials
         self._validate_credentials()
+        # Hashtags depend only on the city; assemble the line once
+        self._hashtag_line = self._build_hashtag_line()
+        # Account-scoped endpoints never change for a poster instance
+        self._media_url = f"{self.GRAPH_API_URL}/{self.account_id}/media"
+        self._media_publish_url = f"{self.GRAPH_API_URL}/{self.account_id}/media_publish"
 
     def _validate_credentials(self):
         """Validate Instagram credentials."""
@@ -38,25 +53,8 @@ class InstagramPoster:
     def account_id(self) -> str:
         return self.credentials["account_id"]
 
-    def build_caption(self, weather: WeatherData) -> str:
-        """Build Instagram caption with weather info and hashtags."""
-
-        # Main content - Instagram allows longer captions
-        lines = [
-            f"{weather.emoji} {self.city.name} Weather Update",
-            "",
-            f"🌡️ Temperature: {weather.format_temperature('C')} ({weather.format_temperature('F')})",
-            f"💨 Feels like: {weather.feels_like_c:.0f}°C",
-            f"💧 Humidity: {weather.humidity}%",
-            f"☁️ Conditions: {weather.description.title()}",
-            "",
-            f"📅 {weather.format_date('%B %d, %Y')}",
-            "",
-            "—" * 10,
-            "",
-        ]
-
-        # Add hashtags - Instagram allows up to 30
+    def _build_hashtag_line(self) -> str:
+        """Assemble the city's hashtag line - Instagram allows up to 30."""
         hashtags = self.city.hashtags.copy() if self.city.hashtags else []
 
         # Add standard hashtags
@@ -79,7 +77,26 @@ class InstagramPoster:
         all_hashtags = hashtags + [h for h in standard_hashtags if h not in hashtags]
         unique_hashtags = list(dict.fromkeys(all_hashtags))[:25]  # Limit to 25
 
-        lines.append(" ".join(unique_hashtags))
+        return " ".join(unique_hashtags)
+
+    def build_caption(self, weather: WeatherData) -> str:
+        """Build Instagram caption with weather info and hashtags."""
+
+        # Main content - Instagram allows longer captions
+        lines = [
+            f"{weather.emoji} {self.city.name} Weather Update",
+            "",
+            f"🌡️ Temperature: {weather.format_temperature('C')} ({weather.format_temperature('F')})",
+            f"💨 Feels like: {weather.feels_like_c:.0f}°C",
+            f"💧 Humidity: {weather.humidity}%",
+            f"☁️ Conditions: {weather.description.title()}",
+            "",
+            f"📅 {weather.format_date('%B %d, %Y')}",
+            "",
+            "—" * 10,
+            "",
+            self._hashtag_line,
+        ]
 
         return "\n".join(lines)
 
@@ -87,58 +104,10 @@ class InstagramPoster:
         """
         Upload image to a public URL for Instagram.
 
-        Instagram Graph API requires images to be hosted at a public URL.
-        This uses a temporary hosting solution.
+        Instagram Graph API requires images to be hosted at a public URL;
+        the upload itself lives in the shared hosting module.
         """
-
-        # Option 1: Use environment variable for your own hosting endpoint
-        hosting_endpoint = os.getenv("IMAGE_HOSTING_ENDPOINT")
-
-        if hosting_endpoint:
-            # Upload to your own hosting
-            try:
-                with open(image_path, "rb") as f:
-                    response = requests.post(
-                        hosting_endpoint,
-                        files={"image": f},
-                        timeout=60,
-                    )
-                    response.raise_for_status()
-                    return response.json().get("url")
-            except Exception as e:
-                print(f"Error uploading to custom hosting: {e}")
-                return None
-
-        # Option 2: Use imgbb (free tier available)
-        imgbb_api_key = os.getenv("IMGBB_API_KEY")
-        if imgbb_api_key:
-            try:
-                import base64
-                with open(image_path, "rb") as f:
-                    image_data = base64.b64encode(f.read()).decode()
-
-                response = requests.post(
-                    "https://api.imgbb.com/1/upload",
-                    data={
-                        "key": imgbb_api_key,
-                        "image": image_data,
-                        "expiration": 86400,  # 24 hours
-                    },
-                    timeout=60,
-                )
-                response.raise_for_status()
-                data = response.json()["data"]
-                # Use full quality URL (image.url or url) - NOT display_url which is compressed
-                # display_url = medium quality, url/image.url = full quality
-                full_quality_url = data.get("image", {}).get("url") or data.get("url")
-                print(f"ImgBB full quality URL: {full_quality_url}")
-                return full_quality_url
-            except Exception as e:
-                print(f"Error uploading to imgbb: {e}")
-                return None
-
-        print("No image hosting configured. Set IMAGE_HOSTING_ENDPOINT or IMGBB_API_KEY")
-        return None
+        return hosting.upload_image(image_path)
 
     def create_story_image(self, image_path: Path) -> Optional[Path]:
         """
@@ -204,11 +173,11 @@ class InstagramPoster:
             background = background.convert('RGB')
             background.save(temp_file.name, 'JPEG', quality=95, optimize=True)
 
-            print(f"Story image created: {temp_file.name}")
+            logger.info(f"Story image created: {temp_file.name}")
             return Path(temp_file.name)
 
         except Exception as e:
-            print(f"Error creating story image: {e}")
+            logger.error(f"Error creating story image: {e}")
             return None
 
     def create_media_container(self, image_url: str, caption: str, media_type: str = "IMAGE", max_retries: int = 3) -> Optional[str]:
@@ -225,7 +194,7 @@ class InstagramPoster:
             max_retries: Number of retry attempts
         """
 
-        url = f"{self.GRAPH_API_URL}/{self.account_id}/media"
+        url = self._media_url
 
         params = {
             "image_url": image_url,
@@ -241,7 +210,7 @@ class InstagramPoster:
 
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, data=params, timeout=60)  # Increased timeout
+                response = _session.post(url, data=params, timeout=60)  # Increased timeout
                 response.raise_for_status()
                 return response.json().get("id")
             except requests.RequestException as e:
@@ -251,13 +220,13 @@ class InstagramPoster:
                     # Check if it's a timeout error from Instagram
                     if "Timeout" in error_msg or "2207003" in error_msg:
                         wait_time = (attempt + 1) * 10  # 10s, 20s, 30s
-                        print(f"Instagram timeout downloading image. Retry {attempt + 1}/{max_retries} in {wait_time}s...")
+                        logger.info(f"Instagram timeout downloading image. Retry {attempt + 1}/{max_retries} in {wait_time}s...")
                         time.sleep(wait_time)
                         continue
 
-                print(f"Error creating media container: {e}")
+                logger.error(f"Error creating media container: {e}")
                 if error_msg:
-                    print(f"Response: {error_msg}")
+                    logger.info(f"Response: {error_msg}")
 
                 # Don't retry on non-timeout errors
                 if attempt == max_retries - 1:
@@ -265,10 +234,45 @@ class InstagramPoster:
 
         return None
 
+    def wait_for_container(self, creation_id: str, timeout: int = 60) -> bool:
+        """
+        Poll the media container until Instagram finishes processing it.
+
+        Replaces the fixed sleeps before publish: most containers are
+        ready in a couple of seconds, and slow ones get the full timeout
+        instead of failing. Returns False only if Instagram reports an
+        ERROR status; timeouts fall through to a publish attempt.
+        """
+        url = f"{self.GRAPH_API_URL}/{creation_id}"
+        params = {"fields": "status_code", "access_token": self.access_token}
+
+        deadline = time.monotonic() + timeout
+        delay = 2
+        while time.monotonic() < deadline:
+            try:
+                response = _session.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                status = response.json().get("status_code")
+            except requests.RequestException as e:
+                logger.error(f"Error checking container status: {e}")
+                return True  # Can't poll; let publish_media surface errors
+
+            if status == "FINISHED":
+                return True
+            if status == "ERROR":
+                logger.error(f"Instagram container {creation_id} failed processing")
+                return False
+
+            time.sleep(delay)
+            delay = min(delay * 2, 10)
+
+        logger.warning(f"Container {creation_id} still processing after {timeout}s; trying publish")
+        return True
+
     def publish_media(self, creation_id: str) -> Optional[str]:
         """Publish the media container."""
 
-        url = f"{self.GRAPH_API_URL}/{self.account_id}/media_publish"
+        url = self._media_publish_url
 
         params = {
             "creation_id": creation_id,
@@ -276,15 +280,37 @@ class InstagramPoster:
         }
 
         try:
-            response = requests.post(url, data=params, timeout=60)
+            response = _session.post(url, data=params, timeout=60)
             response.raise_for_status()
             return response.json().get("id")
         except requests.RequestException as e:
-            print(f"Error publishing media: {e}")
+            logger.error(f"Error publishing media: {e}")
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
+                logger.info(f"Response: {e.response.text}")
             return None
 
+    def _prepare_story(self, image_path: Path) -> Optional[tuple[Path, str]]:
+        """Render the 9:16 story image and upload it to hosting."""
+        story_image_path = self.create_story_image(image_path)
+        if not story_image_path:
+            return None
+
+        logger.info("Uploading story image to hosting...")
+        story_image_url = self.upload_image_to_hosting(story_image_path)
+        if not story_image_url:
+            self._discard_story_image(story_image_path)
+            return None
+
+        return story_image_path, story_image_url
+
+    @staticmethod
+    def _discard_story_image(story_image_path: Path) -> None:
+        """Remove the temporary story image."""
+        try:
+            os.unlink(story_image_path)
+        except OSError:
+            pass
+
     def post(
         self,
         image_path: Path,
@@ -297,91 +323,96 @@ class InstagramPoster:
         caption = self.build_caption(weather)
 
         if dry_run:
-            print(f"[DRY RUN] Would post to Instagram for {self.city.name}:")
-            print(f"  Image: {image_path}")
-            print(f"  Caption: {caption[:100]}...")
-            print(f"  Story: {'Yes' if post_to_story else 'No'}")
+            logger.info(f"[DRY RUN] Would post to Instagram for {self.city.name}:")
+            logger.info(f"  Image: {image_path}")
+            logger.info(f"  Caption: {caption[:100]}...")
+            logger.info(f"  Story: {'Yes' if post_to_story else 'No'}")
             return "dry_run_post_id"
 
+        # Kick off story preparation (PIL render + hosting upload) in the
+        # background; it is independent of the feed flow and its CDN wait
+        # overlaps the feed container processing below.
+        story_future = None
+        if post_to_story:
+            story_future = get_executor().submit(self._prepare_story, image_path)
+
         # Step 1: Upload image to public hosting
-        print(f"Uploading image to hosting for {self.city.name}...")
+        logger.info(f"Uploading image to hosting for {self.city.name}...")
         image_url = self.upload_image_to_hosting(image_path)
 
         if not image_url:
-            print(f"Failed to upload image for {self.city.name}")
+            logger.error(f"Failed to upload image for {self.city.name}")
+            self._drain_story(story_future)
             return None
 
-        print(f"Image hosted at: {image_url}")
+        logger.info(f"Image hosted at: {image_url}")
 
         # Step 2: Wait for image to be fully accessible
         # ImgBB CDN needs time before Instagram can reliably download
-        print("Waiting for image to be accessible...")
+        logger.info("Waiting for image to be accessible...")
         time.sleep(10)
 
         # Step 3: Create media container for FEED (with retry logic)
-        print(f"Creating Instagram media container for {self.city.name}...")
+        logger.info(f"Creating Instagram media container for {self.city.name}...")
         creation_id = self.create_media_container(image_url, caption, media_type="IMAGE")
 
         if not creation_id:
-            print(f"Failed to create media container for {self.city.name}")
+            logger.error(f"Failed to create media container for {self.city.name}")
+            self._drain_story(story_future)
             return None
 
-        # Step 4: Wait for Instagram to process the media
-        print("Waiting for media processing...")
-        time.sleep(10)  # Increased wait time
+        # Step 4: Wait for Instagram to finish processing the container
+        logger.info("Waiting for media processing...")
+        if not self.wait_for_container(creation_id):
+            logger.error(f"Media container failed for {self.city.name}")
+            self._drain_story(story_future)
+            return None
 
         # Step 5: Publish to FEED
-        print(f"Publishing to Instagram feed for {self.city.name}...")
+        logger.info(f"Publishing to Instagram feed for {self.city.name}...")
         post_id = self.publish_media(creation_id)
 
         if post_id:
-            print(f"Instagram feed post published! ID: {post_id}")
+            logger.info(f"Instagram feed post published! ID: {post_id}")
         else:
-            print(f"Failed to publish to Instagram feed for {self.city.name}")
+            logger.error(f"Failed to publish to Instagram feed for {self.city.name}")
+            self._drain_story(story_future)
             return None
 
-        # Step 6: Also post to STORY if enabled
-        if post_to_story:
-            print(f"Creating Instagram Story for {self.city.name}...")
-
-            # Create story-optimized image (9:16 with blurred background)
-            story_image_path = self.create_story_image(image_path)
-
-            if story_image_path:
-                # Upload story image to hosting
-                print("Uploading story image to hosting...")
-                story_image_url = self.upload_image_to_hosting(story_image_path)
+        # Step 6: Also post to STORY if enabled, using the image prepared
+        # and uploaded in the background while the feed flow ran
+        if story_future is not None:
+            prepared = story_future.result()
 
-                if story_image_url:
-                    print(f"Story image hosted at: {story_image_url}")
-                    time.sleep(10)  # Wait for CDN propagation
+            if prepared:
+                story_image_path, story_image_url = prepared
+                logger.info(f"Story image hosted at: {story_image_url}")
 
-                    story_creation_id = self.create_media_container(story_image_url, caption, media_type="STORIES")
+                story_creation_id = self.create_media_container(story_image_url, caption, media_type="STORIES")
 
-                    if story_creation_id:
-                        print("Waiting for story processing...")
-                        time.sleep(5)
-
-                        story_id = self.publish_media(story_creation_id)
-                        if story_id:
-                            print(f"Instagram Story published! ID: {story_id}")
-                        else:
-                            print(f"Failed to publish Story (feed post succeeded)")
+                if story_creation_id and self.wait_for_container(story_creation_id):
+                    story_id = self.publish_media(story_creation_id)
+                    if story_id:
+                        logger.info(f"Instagram Story published! ID: {story_id}")
                     else:
-                        print(f"Failed to create Story container (feed post succeeded)")
+                        logger.error(f"Failed to publish Story (feed post succeeded)")
                 else:
-                    print(f"Failed to upload story image (feed post succeeded)")
+                    logger.error(f"Story container not ready (feed post succeeded)")
 
-                # Clean up temporary story image
-                try:
-                    os.unlink(story_image_path)
-                except Exception:
-                    pass
+                self._discard_story_image(story_image_path)
             else:
-                print(f"Failed to create story image (feed post succeeded)")
+                logger.error(f"Failed to prepare story image (feed post succeeded)")
 
         return post_id
 
+    def _drain_story(self, story_future) -> None:
+        """Wait for background story prep and discard its temp image."""
+        if story_future is None:
+            return
+        prepared = story_future.result()
+        if prepared:
+            self._discard_story_image(prepared[0])
+
 
 def post_to_instagram(
     city: CityConfig,
@@ -392,12 +423,12 @@ def post_to_instagram(
 ) -> Optional[str]:
     """Convenience function to post to Instagram."""
     if not city.platforms.instagram:
-        print(f"Instagram disabled for {city.name}")
+        logger.info(f"Instagram disabled for {city.name}")
         return None
 
     try:
         poster = InstagramPoster(city, credentials)
         return poster.post(image_path, weather, dry_run)
     except ValueError as e:
-        print(f"Instagram configuration error: {e}")
+        logger.info(f"Instagram configuration error: {e}")
         return None
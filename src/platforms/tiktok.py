@@ -1,13 +1,22 @@
 """TikTok API integration for posting weather images as photo posts."""
 
-import os
-import time
+import logging
 import requests
 from pathlib import Path
 from typing import Optional
 
 from ..config import CityConfig
+from ..concurrency import get_executor
 from ..weather import WeatherData
+from . import hosting
+
+logger = logging.getLogger(__name__)
+
+
+# Shared session for TikTok API calls: keep-alive reuses the TLS
+# connection across the init/post round-trips instead of a fresh
+# handshake per call.
+_session = requests.Session()
 
 
 class TikTokPoster:
@@ -24,7 +33,9 @@ class TikTokPoster:
         self.city = city
         self.credentials = credentials
         self._validate_credentials()
-    
+        # Hashtags depend only on the city; assemble the line once
+        self._hashtag_line = self._build_hashtag_line()
+
     def _validate_credentials(self):
         """Validate TikTok credentials."""
         if not self.credentials.get("access_token"):
@@ -34,35 +45,43 @@ class TikTokPoster:
     def access_token(self) -> str:
         return self.credentials["access_token"]
     
-    def build_description(self, weather: WeatherData) -> str:
-        """Build TikTok description with weather info and hashtags."""
-        
-        # TikTok descriptions should be shorter and more engaging
-        lines = [
-            f"{weather.emoji} {self.city.name} Weather Today!",
-            f"🌡️ {weather.format_temperature('C')} | {weather.description.title()}",
-            "",
-        ]
-        
-        # Add hashtags - TikTok uses hashtags heavily
+    def _build_hashtag_line(self) -> str:
+        """Assemble the hashtag line - depends only on the city."""
         hashtags = self.city.hashtags.copy() if self.city.hashtags else []
-        
+
         standard_hashtags = [
-            f"#{self.city.name.replace(' ', '').lower()}",
+            f"#{self.city.slug}",
             "#weather",
             "#fyp",
             "#foryou",
             "#citylife",
             "#aiart",
             "#dailyweather",
-            f"#{self.city.country.replace(' ', '').lower()}",
+            f"#{self.city.country_slug}",
         ]
-        
-        all_hashtags = hashtags + [h for h in standard_hashtags if h.lower() not in [x.lower() for x in hashtags]]
-        unique_hashtags = list(dict.fromkeys(all_hashtags))[:10]
-        
-        lines.append(" ".join(unique_hashtags))
-        
+
+        # One-pass case-insensitive dedup of the standard tags against
+        # the city's own, then the usual exact dedup + limit
+        seen = {h.lower() for h in hashtags}
+        for tag in standard_hashtags:
+            if tag.lower() not in seen:
+                hashtags.append(tag)
+                seen.add(tag.lower())
+
+        unique_hashtags = list(dict.fromkeys(hashtags))[:10]
+        return " ".join(unique_hashtags)
+
+    def build_description(self, weather: WeatherData) -> str:
+        """Build TikTok description with weather info and hashtags."""
+
+        # TikTok descriptions should be shorter and more engaging
+        lines = [
+            f"{weather.emoji} {self.city.name} Weather Today!",
+            f"🌡️ {weather.format_temperature('C')} | {weather.description.title()}",
+            "",
+            self._hashtag_line,
+        ]
+
         return "\n".join(lines)
     
     def init_photo_post(self, description: str) -> Optional[dict]:
@@ -91,63 +110,25 @@ class TikTokPoster:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = _session.post(url, headers=headers, json=data, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            print(f"Error initializing TikTok photo post: {e}")
+            logger.error(f"Error initializing TikTok photo post: {e}")
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
+                logger.info(f"Response: {e.response.text}")
             return None
     
     def upload_image_direct(self, image_path: Path) -> Optional[str]:
         """
-        Upload image directly to TikTok's servers.
-        
-        Alternative: Use TikTok's Direct Post API with image URL.
-        This requires the image to be hosted at a public URL.
+        Upload the image to public hosting for TikTok's PULL_FROM_URL flow.
+
+        TikTok's Direct Post API pulls the image from a public URL, so
+        this shares the hosting module with Instagram - same streaming
+        base64 encode and content-hash URL cache (one upload serves both
+        platforms when they post the same image).
         """
-        
-        # TikTok Direct Post with URL method
-        # Requires image hosting similar to Instagram
-        
-        hosting_endpoint = os.getenv("IMAGE_HOSTING_ENDPOINT")
-        imgbb_api_key = os.getenv("IMGBB_API_KEY")
-        
-        if hosting_endpoint:
-            try:
-                with open(image_path, "rb") as f:
-                    response = requests.post(
-                        hosting_endpoint,
-                        files={"image": f},
-                        timeout=60,
-                    )
-                    response.raise_for_status()
-                    return response.json().get("url")
-            except Exception as e:
-                print(f"Error uploading to custom hosting: {e}")
-        
-        if imgbb_api_key:
-            try:
-                import base64
-                with open(image_path, "rb") as f:
-                    image_data = base64.b64encode(f.read()).decode()
-                
-                response = requests.post(
-                    "https://api.imgbb.com/1/upload",
-                    data={
-                        "key": imgbb_api_key,
-                        "image": image_data,
-                        "expiration": 86400,
-                    },
-                    timeout=60,
-                )
-                response.raise_for_status()
-                return response.json()["data"]["url"]
-            except Exception as e:
-                print(f"Error uploading to imgbb: {e}")
-        
-        return None
+        return hosting.upload_image(image_path)
     
     def post_photo(self, image_url: str, description: str) -> Optional[str]:
         """Post a photo to TikTok using Direct Post API."""
@@ -177,20 +158,20 @@ class TikTokPoster:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = _session.post(url, headers=headers, json=data, timeout=30)
             response.raise_for_status()
             result = response.json()
             
             if result.get("error", {}).get("code") == "ok":
                 return result.get("data", {}).get("publish_id")
             else:
-                print(f"TikTok API error: {result}")
+                logger.info(f"TikTok API error: {result}")
                 return None
                 
         except requests.RequestException as e:
-            print(f"Error posting to TikTok: {e}")
+            logger.error(f"Error posting to TikTok: {e}")
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
+                logger.info(f"Response: {e.response.text}")
             return None
     
     def post(
@@ -200,36 +181,43 @@ class TikTokPoster:
         dry_run: bool = False,
     ) -> Optional[str]:
         """Post image to TikTok."""
-        
-        description = self.build_description(weather)
-        
+
         if dry_run:
-            print(f"[DRY RUN] Would post to TikTok for {self.city.name}:")
-            print(f"  Image: {image_path}")
-            print(f"  Description: {description[:100]}...")
+            description = self.build_description(weather)
+            logger.info(f"[DRY RUN] Would post to TikTok for {self.city.name}:")
+            logger.info(f"  Image: {image_path}")
+            logger.info(f"  Description: {description[:100]}...")
             return "dry_run_publish_id"
-        
-        # Step 1: Upload image to hosting
-        print(f"Uploading image for TikTok post ({self.city.name})...")
-        image_url = self.upload_image_direct(image_path)
-        
+
+        # Step 1: Upload image to hosting in the background; the
+        # description build (and its allocations) overlap the upload
+        logger.info(f"Uploading image for TikTok post ({self.city.name})...")
+        upload_future = get_executor().submit(self.upload_image_direct, image_path)
+        description = self.build_description(weather)
+        image_url = upload_future.result()
+
         if not image_url:
-            print(f"Failed to upload image for TikTok ({self.city.name})")
-            print("Ensure IMAGE_HOSTING_ENDPOINT or IMGBB_API_KEY is set")
+            logger.error(f"Failed to upload image for TikTok ({self.city.name})")
+            logger.info("Ensure IMAGE_HOSTING_ENDPOINT or IMGBB_API_KEY is set")
             return None
         
         # Step 2: Create post
-        print(f"Creating TikTok post for {self.city.name}...")
+        logger.info(f"Creating TikTok post for {self.city.name}...")
         publish_id = self.post_photo(image_url, description)
         
         if publish_id:
-            print(f"TikTok post created! Publish ID: {publish_id}")
+            logger.info(f"TikTok post created! Publish ID: {publish_id}")
             return publish_id
         else:
-            print(f"Failed to post to TikTok for {self.city.name}")
+            logger.error(f"Failed to post to TikTok for {self.city.name}")
             return None
 
 
+# Posters cached per city: credentials are global, so a city's poster
+# (validated creds, hashtag line) is reusable across calls
+_posters: dict[str, TikTokPoster] = {}
+
+
 def post_to_tiktok(
     city: CityConfig,
     image_path: Path,
@@ -239,12 +227,14 @@ def post_to_tiktok(
 ) -> Optional[str]:
     """Convenience function to post to TikTok."""
     if not city.platforms.tiktok:
-        print(f"TikTok disabled for {city.name}")
+        logger.info(f"TikTok disabled for {city.name}")
         return None
 
     try:
-        poster = TikTokPoster(city, credentials)
+        poster = _posters.get(city.id)
+        if poster is None:
+            poster = _posters[city.id] = TikTokPoster(city, credentials)
         return poster.post(image_path, weather, dry_run)
     except ValueError as e:
-        print(f"TikTok configuration error: {e}")
+        logger.info(f"TikTok configuration error: {e}")
         return None
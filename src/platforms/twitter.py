@@ -1,5 +1,7 @@
 """X (Twitter) API integration for posting weather images."""
 
+import functools
+import logging
 from pathlib import Path
 from typing import Optional
 import tweepy
@@ -7,6 +9,37 @@ import tweepy
 from ..config import CityConfig
 from ..weather import WeatherData
 
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_twitter_clients(
+    api_key: str,
+    api_secret: str,
+    access_token: str,
+    access_token_secret: str,
+) -> tuple[tweepy.Client, tweepy.API]:
+    """
+    Build (v2 Client, v1.1 API) for a credential set, cached at module
+    scope so repeated poster construction reuses the same authenticated
+    clients and their kept-alive connection pools.
+    """
+    client = tweepy.Client(
+        consumer_key=api_key,
+        consumer_secret=api_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret,
+    )
+
+    # API v1.1 for media upload (v2 doesn't support media upload directly)
+    auth = tweepy.OAuth1UserHandler(
+        api_key,
+        api_secret,
+        access_token,
+        access_token_secret,
+    )
+    return client, tweepy.API(auth)
+
 
 class TwitterPoster:
     """Post images to X (Twitter) using API v2."""
@@ -17,7 +50,9 @@ class TwitterPoster:
         self.client = None
         self.api_v1 = None  # Needed for media upload
         self._authenticate()
-    
+        # Hashtags depend only on the city; assemble the line once
+        self._hashtag_line = self._build_hashtag_line()
+
     def _authenticate(self):
         """Set up Twitter API authentication."""
         creds = self.credentials
@@ -29,27 +64,28 @@ class TwitterPoster:
             creds.get("access_token_secret"),
         ]):
             raise ValueError(f"Missing Twitter credentials (used for {self.city.name})")
-        
-        # API v2 client for posting tweets
-        self.client = tweepy.Client(
-            consumer_key=creds["api_key"],
-            consumer_secret=creds["api_secret"],
-            access_token=creds["access_token"],
-            access_token_secret=creds["access_token_secret"],
-        )
-        
-        # API v1.1 for media upload (v2 doesn't support media upload directly)
-        auth = tweepy.OAuth1UserHandler(
+
+        self.client, self.api_v1 = _get_twitter_clients(
             creds["api_key"],
             creds["api_secret"],
             creds["access_token"],
             creds["access_token_secret"],
         )
-        self.api_v1 = tweepy.API(auth)
     
+    def _build_hashtag_line(self) -> str:
+        """Assemble the hashtag line - depends only on the city."""
+        hashtags = list(self.city.hashtags) if self.city.hashtags else [
+            f"#{self.city.name.replace(' ', '')}",
+            "#Weather",
+        ]
+        hashtags.extend(["#AIArt", "#CityWeather"])
+
+        # Deduplicate and limit hashtags
+        return " ".join(list(dict.fromkeys(hashtags))[:6])
+
     def build_tweet_text(self, weather: WeatherData) -> str:
         """Build the tweet text with weather info and hashtags."""
-        
+
         # Main content
         lines = [
             f"{weather.emoji} {self.city.name} Weather",
@@ -57,16 +93,9 @@ class TwitterPoster:
             f"📅 {weather.format_date('%B %d, %Y')}",
             f"☁️ {weather.description.title()}",
             "",
+            self._hashtag_line,
         ]
-        
-        # Add hashtags
-        hashtags = self.city.hashtags or [f"#{self.city.name.replace(' ', '')}", "#Weather"]
-        hashtags.extend(["#AIArt", "#CityWeather"])
-        
-        # Deduplicate and limit hashtags
-        unique_hashtags = list(dict.fromkeys(hashtags))[:6]
-        lines.append(" ".join(unique_hashtags))
-        
+
         return "\n".join(lines)
     
     def post(
@@ -80,41 +109,52 @@ class TwitterPoster:
         tweet_text = self.build_tweet_text(weather)
         
         if dry_run:
-            print(f"[DRY RUN] Would post to Twitter for {self.city.name}:")
-            print(f"  Image: {image_path}")
-            print(f"  Text: {tweet_text[:100]}...")
+            logger.info(f"[DRY RUN] Would post to Twitter for {self.city.name}:")
+            logger.info(f"  Image: {image_path}")
+            logger.info(f"  Text: {tweet_text[:100]}...")
             return "dry_run_tweet_id"
         
         try:
-            # Upload media using v1.1 API
-            print(f"Uploading image to Twitter for {self.city.name}...")
-            media = self.api_v1.media_upload(filename=str(image_path))
+            # Upload media using v1.1 API. Chunked upload streams the
+            # file in pieces (INIT/APPEND/FINALIZE) instead of reading
+            # it into memory as one multipart body.
+            logger.info(f"Uploading image to Twitter for {self.city.name}...")
+            media = self.api_v1.media_upload(
+                filename=str(image_path),
+                chunked=True,
+                media_category="tweet_image",
+            )
             media_id = media.media_id
             
             # Post tweet with media using v2 API
-            print(f"Posting tweet for {self.city.name}...")
+            logger.info(f"Posting tweet for {self.city.name}...")
             response = self.client.create_tweet(
                 text=tweet_text,
                 media_ids=[media_id],
             )
             
             tweet_id = response.data["id"]
-            print(f"Tweet posted successfully! ID: {tweet_id}")
+            logger.info(f"Tweet posted successfully! ID: {tweet_id}")
             return tweet_id
             
         except tweepy.TweepyException as e:
-            print(f"Error posting to Twitter for {self.city.name}: {e}")
+            logger.error(f"Error posting to Twitter for {self.city.name}: {e}")
             # Print additional details for debugging 403 errors
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Twitter API Response Status: {e.response.status_code}")
-                print(f"Twitter API Response: {e.response.text}")
+                logger.info(f"Twitter API Response Status: {e.response.status_code}")
+                logger.info(f"Twitter API Response: {e.response.text}")
             if hasattr(e, 'api_errors'):
-                print(f"Twitter API Errors: {e.api_errors}")
+                logger.error(f"Twitter API Errors: {e.api_errors}")
             if hasattr(e, 'api_codes'):
-                print(f"Twitter API Codes: {e.api_codes}")
+                logger.info(f"Twitter API Codes: {e.api_codes}")
             return None
 
 
+# Posters cached per city: credentials are global, so a city's poster
+# (validated creds, hashtag line, clients) is reusable across calls
+_posters: dict[str, TwitterPoster] = {}
+
+
 def post_to_twitter(
     city: CityConfig,
     image_path: Path,
@@ -124,12 +164,14 @@ def post_to_twitter(
 ) -> Optional[str]:
     """Convenience function to post to Twitter."""
     if not city.platforms.twitter:
-        print(f"Twitter disabled for {city.name}")
+        logger.info(f"Twitter disabled for {city.name}")
         return None
 
     try:
-        poster = TwitterPoster(city, credentials)
+        poster = _posters.get(city.id)
+        if poster is None:
+            poster = _posters[city.id] = TwitterPoster(city, credentials)
         return poster.post(image_path, weather, dry_run)
     except ValueError as e:
-        print(f"Twitter configuration error: {e}")
+        logger.info(f"Twitter configuration error: {e}")
         return None
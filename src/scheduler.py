@@ -6,54 +6,113 @@ This module handles selecting ONE random city per run,
 excluding cities that have been posted recently.
 """
 
+import logging
 import random
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from .config import Config, CityConfig
 
+logger = logging.getLogger(__name__)
+
+
+class _AliasTable:
+    """
+    Walker/Vose alias table for O(1) weighted sampling.
+
+    Built once per city pool; each draw costs one random number and one
+    table lookup instead of rebuilding cumulative weights per call.
+    """
+
+    def __init__(self, weights: list[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+
+        self.n = n
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def draw(self) -> int:
+        i = int(random.random() * self.n)
+        return i if random.random() < self.prob[i] else self.alias[i]
+
+
+# Alias table cached per config instance (the city pool is immutable after load)
+_alias_cache: dict[int, _AliasTable] = {}
+
+
+def _get_alias_table(config: 'Config') -> _AliasTable:
+    table = _alias_cache.get(id(config))
+    if table is None:
+        weights = [city.weight for city in config.get_enabled_cities()]
+        table = _AliasTable(weights)
+        _alias_cache[id(config)] = table
+    return table
+
 
 def select_random_city(
     config: 'Config',
-    excluded_ids: list[str] = None
+    excluded_ids: Optional[set[str]] = None
 ) -> Optional['CityConfig']:
     """
     Select ONE random city using weighted random selection.
 
     Cities with higher weight values (1-100) are more likely to be selected.
-    Cities in the excluded_ids list will not be selected.
+    Cities in the excluded_ids set will not be selected.
 
     Args:
         config: Configuration object containing all cities
-        excluded_ids: List of city IDs to exclude (recently posted)
+        excluded_ids: City IDs to exclude (recently posted)
 
     Returns:
         Selected CityConfig object, or None if no cities available
     """
-    excluded_ids = excluded_ids or []
+    excluded_ids = excluded_ids or set()
 
     # Get all enabled cities
     enabled_cities = config.get_enabled_cities()
 
-    # Filter out excluded cities
-    available_cities = [
-        city for city in enabled_cities
-        if city.id not in excluded_ids
-    ]
-
-    # If all cities are excluded, reset and use all enabled cities
-    if not available_cities:
-        print("📢 All cities recently posted - resetting exclusion list")
-        available_cities = list(enabled_cities)
-
-    if not available_cities:
-        print("❌ No enabled cities available")
+    if not enabled_cities:
+        logger.error("❌ No enabled cities available")
         return None
 
-    # Extract weights for available cities
-    weights = [city.weight for city in available_cities]
+    excluded = set(excluded_ids)
+    available = [city for city in enabled_cities if city.id not in excluded]
+
+    # If all cities are excluded, reset and draw from all enabled cities
+    if not available:
+        logger.info("📢 All cities recently posted - resetting exclusion list")
+        excluded = set()
+        available = list(enabled_cities)
 
-    # Weighted random selection of ONE city
-    selected = random.choices(available_cities, weights=weights, k=1)[0]
+    # O(1) draw from the precomputed alias table, rejecting excluded
+    # cities. Conditioning the weighted draw on "not excluded" gives the
+    # same distribution as reweighting the available pool directly.
+    table = _get_alias_table(config)
+    for _ in range(32):
+        city = enabled_cities[table.draw()]
+        if city.id not in excluded:
+            return city
 
-    return selected
+    # Heavy exclusion made rejection sampling unlucky; fall back to the
+    # direct weighted draw over the available pool.
+    weights = [city.weight for city in available]
+    return random.choices(available, weights=weights, k=1)[0]
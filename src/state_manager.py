@@ -8,13 +8,18 @@ This module handles:
 3. Simple JSON persistence
 """
 
+import hashlib
+import logging
 import json
 import os
+import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class RecentlyPosted:
@@ -26,6 +31,12 @@ class RecentlyPosted:
     """
 
     posts: list[dict] = field(default_factory=list)
+    # City ids mirrored in a set so membership checks and exclusion
+    # lookups are O(1) instead of scanning the posts list
+    _ids: set = field(init=False, repr=False, default_factory=set)
+
+    def __post_init__(self):
+        self._ids = {p["city_id"] for p in self.posts}
 
     def add_posted(self, city_id: str) -> None:
         """
@@ -38,6 +49,7 @@ class RecentlyPosted:
             "city_id": city_id,
             "posted_at": datetime.now(timezone.utc).isoformat()
         })
+        self._ids.add(city_id)
 
     def cleanup_old(self, hours: int = 24) -> int:
         """
@@ -49,28 +61,32 @@ class RecentlyPosted:
         Returns:
             Number of entries removed
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        # Timestamps are all written by add_posted in the same UTC ISO
+        # format, so the cutoff can be compared as a string - one
+        # isoformat() call instead of a fromisoformat parse per entry
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
         original_count = len(self.posts)
 
-        self.posts = [
-            p for p in self.posts
-            if datetime.fromisoformat(p["posted_at"]) > cutoff
-        ]
+        self.posts = [p for p in self.posts if p["posted_at"] > cutoff]
+        removed = original_count - len(self.posts)
+        if removed:
+            self._ids = {p["city_id"] for p in self.posts}
 
-        return original_count - len(self.posts)
+        return removed
 
-    def get_excluded_ids(self) -> list[str]:
+    def get_excluded_ids(self) -> set[str]:
         """
-        Get list of city IDs that should be excluded from selection.
+        Get the city IDs that should be excluded from selection.
 
         Returns:
-            List of city IDs posted within the retention period
+            Set of city IDs posted within the retention period
         """
-        return [p["city_id"] for p in self.posts]
+        return self._ids
 
     def clear(self) -> None:
         """Clear all entries (used when all cities have been posted)."""
         self.posts = []
+        self._ids = set()
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -95,6 +111,9 @@ class StateManager:
             state_file: Optional custom path to state file
         """
         self.state_file = state_file or self.STATE_FILE
+        # Digest of the last payload written; lets save_recent skip the
+        # write (and its fsync) when nothing actually changed
+        self._last_digest: Optional[bytes] = None
 
     def load_recent(self) -> RecentlyPosted:
         """
@@ -103,24 +122,26 @@ class StateManager:
         Returns:
             RecentlyPosted object (empty if file doesn't exist)
         """
-        if not os.path.exists(self.state_file):
-            return RecentlyPosted()
-
         try:
-            with open(self.state_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # One-shot read: grab the whole (tiny) file in a single
+            # syscall and parse from the string, instead of json.load
+            # pulling it through the buffered reader. Missing file falls
+            # into the handler below, replacing a separate exists() stat.
+            data = json.loads(Path(self.state_file).read_text(encoding="utf-8"))
 
             recent = RecentlyPosted(posts=data.get("posts", []))
 
             # Auto-cleanup old entries on load
             removed = recent.cleanup_old(hours=24)
             if removed > 0:
-                print(f"🧹 Cleaned up {removed} old entries from recently posted")
+                logger.info(f"🧹 Cleaned up {removed} old entries from recently posted")
 
             return recent
 
+        except FileNotFoundError:
+            return RecentlyPosted()
         except (json.JSONDecodeError, KeyError, IOError) as e:
-            print(f"⚠️  Warning: Could not load state from {self.state_file}: {e}")
+            logger.warning(f"⚠️  Warning: Could not load state from {self.state_file}: {e}")
             return RecentlyPosted()
 
     def save_recent(self, recent: RecentlyPosted) -> None:
@@ -134,9 +155,30 @@ class StateManager:
         state_dir = Path(self.state_file).parent
         state_dir.mkdir(parents=True, exist_ok=True)
 
+        # Serialize first and skip the write entirely if the content
+        # matches what this manager last wrote. Compact separators and
+        # ASCII output: the file is machine-written state, not a doc.
+        payload = json.dumps(recent.to_dict(), separators=(",", ":"))
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+        if digest == self._last_digest:
+            return
+
+        # Write to a temp file in the same directory, then atomically
+        # rename over the state file: a crash mid-write leaves the old
+        # state intact instead of a truncated JSON file.
         try:
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(recent.to_dict(), f, indent=2, ensure_ascii=False)
+            fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
         except IOError as e:
-            print(f"❌ Error: Could not save state to {self.state_file}: {e}")
+            logger.error(f"❌ Error: Could not save state to {self.state_file}: {e}")
             raise
+
+        self._last_digest = digest
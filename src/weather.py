@@ -1,13 +1,20 @@
 """OpenWeatherMap API integration for fetching current weather data."""
 
+import json
+import logging
+import re
 import requests
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Optional
 from datetime import datetime
-import pytz
 
 from .config import CityConfig, get_config
 
+logger = logging.getLogger(__name__)
+
 
 # Weather condition to emoji mapping
 WEATHER_ICONS = {
@@ -47,7 +54,33 @@ WEATHER_ATMOSPHERE = {
 }
 
 
-@dataclass
+def _compile_keys(table: dict) -> re.Pattern:
+    """
+    Compile a table's keys into one alternation pattern.
+
+    A single C-level scan replaces the per-key Python substring loop.
+    Longest keys first, so specific conditions ("light rain") win over
+    their substrings ("rain").
+    """
+    keys = sorted(table, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in keys))
+
+
+_ICONS_PATTERN = _compile_keys(WEATHER_ICONS)
+_ATMOSPHERE_PATTERN = _compile_keys(WEATHER_ATMOSPHERE)
+
+# OWM's main field is a small fixed vocabulary; map the lowercased
+# values that aren't already caught by the tables above so the fallback
+# is one dict lookup instead of a substring chain.
+_MAIN_FALLBACK_EMOJI = {
+    "clear": "☀️",
+    "clouds": "☁️",
+    "rain": "🌧️",
+    "snow": "🌨️",
+}
+
+
+@dataclass(slots=True)
 class WeatherData:
     """Weather data container."""
     city_name: str
@@ -65,46 +98,79 @@ class WeatherData:
     timestamp: datetime
     sunrise: datetime
     sunset: datetime
-    
+    description_lower: str = field(init=False, repr=False)
+    main_condition_lower: str = field(init=False, repr=False)
+    # Memoized derived values; each is computed once on first access
+    # (cached_property would not survive a move to slots, so these use
+    # the same sentinel-field pattern as CityConfig.tz)
+    _emoji: Optional[str] = field(default=None, init=False, repr=False)
+    _atmosphere: Optional[str] = field(default=None, init=False, repr=False)
+    _is_daytime: Optional[bool] = field(default=None, init=False, repr=False)
+    _time_of_day: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        # Lowercase once at construction; every emoji/atmosphere lookup
+        # scans these fields
+        self.description_lower = self.description.lower()
+        self.main_condition_lower = self.main_condition.lower()
+
     @property
     def emoji(self) -> str:
-        """Get weather emoji based on description."""
-        desc_lower = self.description.lower()
-        for key, emoji in WEATHER_ICONS.items():
-            if key in desc_lower:
-                return emoji
+        """Get weather emoji based on description (memoized)."""
+        if self._emoji is None:
+            self._emoji = self._compute_emoji()
+        return self._emoji
+
+    def _compute_emoji(self) -> str:
+        # Exact hit first: most OWM descriptions ("clear sky",
+        # "light rain", ...) are verbatim table keys
+        emoji = WEATHER_ICONS.get(self.description_lower)
+        if emoji:
+            return emoji
+        match = _ICONS_PATTERN.search(self.description_lower)
+        if match:
+            return WEATHER_ICONS[match.group()]
         # Fallback based on main condition
-        main_lower = self.main_condition.lower()
-        if "clear" in main_lower:
-            return "☀️"
-        elif "cloud" in main_lower:
-            return "☁️"
-        elif "rain" in main_lower:
-            return "🌧️"
-        elif "snow" in main_lower:
-            return "🌨️"
-        return "🌡️"
-    
+        return _MAIN_FALLBACK_EMOJI.get(self.main_condition_lower, "🌡️")
+
     @property
     def atmosphere_prompt(self) -> str:
-        """Get atmospheric description for image generation prompt."""
-        main_lower = self.main_condition.lower()
-        for key, atmosphere in WEATHER_ATMOSPHERE.items():
-            if key in main_lower or key in self.description.lower():
-                return atmosphere
-        return "pleasant weather, natural lighting"
-    
+        """Get atmospheric description for image generation prompt (memoized)."""
+        if self._atmosphere is None:
+            # The table is keyed by lowercased main values, so an exact
+            # dict hit covers nearly every response
+            atmosphere = WEATHER_ATMOSPHERE.get(self.main_condition_lower)
+            if atmosphere is None:
+                match = (
+                    _ATMOSPHERE_PATTERN.search(self.main_condition_lower)
+                    or _ATMOSPHERE_PATTERN.search(self.description_lower)
+                )
+                atmosphere = (
+                    WEATHER_ATMOSPHERE[match.group()]
+                    if match
+                    else "pleasant weather, natural lighting"
+                )
+            self._atmosphere = atmosphere
+        return self._atmosphere
+
     @property
     def is_daytime(self) -> bool:
-        """Check if current time is between sunrise and sunset."""
-        return self.sunrise <= self.timestamp <= self.sunset
-    
+        """Check if current time is between sunrise and sunset (memoized)."""
+        if self._is_daytime is None:
+            self._is_daytime = self.sunrise <= self.timestamp <= self.sunset
+        return self._is_daytime
+
     @property
     def time_of_day(self) -> str:
-        """Get time of day description for prompt."""
+        """Get time of day description for prompt (memoized)."""
+        if self._time_of_day is None:
+            self._time_of_day = self._compute_time_of_day()
+        return self._time_of_day
+
+    def _compute_time_of_day(self) -> str:
         if not self.is_daytime:
             return "nighttime scene with city lights glowing, stars in the sky"
-        
+
         hour = self.timestamp.hour
         if 5 <= hour < 8:
             return "early morning golden hour, warm sunrise light"
@@ -130,11 +196,63 @@ class WeatherData:
         return self.timestamp.strftime(format_str)
 
 
+# Shared session: reuses the TLS connection to OpenWeatherMap across
+# requests instead of a fresh handshake per call. Transient failures
+# (rate limits, 5xx, connection resets) retry with backoff inside the
+# adapter instead of failing the whole run.
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+    ),
+)
+
+
+# Per-city validator cache for conditional GETs: stores the last
+# response body with its ETag/Last-Modified so a revalidated request
+# gets a bodyless 304 instead of the full payload.
+_CACHE_FILE = Path("state/weather_cache.json")
+_response_cache: Optional[dict] = None
+
+
+def _get_cached_response(city_id: str) -> Optional[dict]:
+    global _response_cache
+    if _response_cache is None:
+        try:
+            _response_cache = json.loads(_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _response_cache = {}
+    return _response_cache.get(city_id)
+
+
+def _store_cached_response(city_id: str, response: requests.Response, data: dict) -> None:
+    validators = {
+        key: response.headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in response.headers
+    }
+    if not validators:
+        return  # Nothing to revalidate against; don't grow the cache
+
+    _response_cache[city_id] = {**validators, "data": data}
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _CACHE_FILE.write_text(json.dumps(_response_cache), encoding="utf-8")
+    except OSError:
+        pass  # Cache persistence is best-effort
+
+
 class WeatherAPI:
     """OpenWeatherMap API client."""
-    
+
     BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-    
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key or get_config().openweather_api_key
         if not self.api_key:
@@ -150,20 +268,48 @@ class WeatherAPI:
                 "units": "metric",  # Get Celsius
             }
             
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Parse timestamps with city's timezone
+            # Conditional GET: send the validators from the last
+            # response for this city; a 304 reuses the cached body
+            cached = _get_cached_response(city.id)
+            headers = {}
+            if cached:
+                if "etag" in cached:
+                    headers["If-None-Match"] = cached["etag"]
+                if "last_modified" in cached:
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+            response = _session.get(
+                self.BASE_URL, params=params, headers=headers, timeout=10
+            )
+            if response.status_code == 304 and cached:
+                data = cached["data"]
+            else:
+                response.raise_for_status()
+                data = response.json()
+                _store_cached_response(city.id, response, data)
+
+            # Parse timestamps with city's timezone. The response's dt
+            # field is the server-side observation time - more accurate
+            # than our clock and consistent with sunrise/sunset.
             tz = city.tz
-            now = datetime.now(tz)
-            sunrise = datetime.fromtimestamp(data["sys"]["sunrise"], tz)
-            sunset = datetime.fromtimestamp(data["sys"]["sunset"], tz)
-            
+            if "dt" in data:
+                now = datetime.fromtimestamp(data["dt"], tz)
+            else:
+                now = datetime.now(tz)
+
+            # Bind the nested sections once instead of re-indexing data
+            # for every field below
+            main = data["main"]
+            weather0 = data["weather"][0]
+            sys_data = data["sys"]
+
+            sunrise = datetime.fromtimestamp(sys_data["sunrise"], tz)
+            sunset = datetime.fromtimestamp(sys_data["sunset"], tz)
+
             # Convert Celsius to Fahrenheit
-            temp_c = data["main"]["temp"]
-            feels_like_c = data["main"]["feels_like"]
-            
+            temp_c = main["temp"]
+            feels_like_c = main["feels_like"]
+
             return WeatherData(
                 city_name=city.name,
                 country=city.country,
@@ -171,10 +317,10 @@ class WeatherAPI:
                 temperature_f=(temp_c * 9/5) + 32,
                 feels_like_c=feels_like_c,
                 feels_like_f=(feels_like_c * 9/5) + 32,
-                humidity=data["main"]["humidity"],
-                description=data["weather"][0]["description"],
-                main_condition=data["weather"][0]["main"],
-                icon_code=data["weather"][0]["icon"],
+                humidity=main["humidity"],
+                description=weather0["description"],
+                main_condition=weather0["main"],
+                icon_code=weather0["icon"],
                 wind_speed=data["wind"]["speed"],
                 clouds_percent=data["clouds"]["all"],
                 timestamp=now,
@@ -183,10 +329,10 @@ class WeatherAPI:
             )
             
         except requests.RequestException as e:
-            print(f"Error fetching weather for {city.name}: {e}")
+            logger.error(f"Error fetching weather for {city.name}: {e}")
             return None
         except (KeyError, ValueError) as e:
-            print(f"Error parsing weather data for {city.name}: {e}")
+            logger.error(f"Error parsing weather data for {city.name}: {e}")
             return None
 
 